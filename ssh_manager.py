@@ -4,20 +4,45 @@ A kitty kitten plugin that integrates with macOS Keychain for SSH connection man
 Uses fzf for selection and stores SSH credentials under the account 'kitty-ssh'.
 """
 
+import atexit
+import functools
 import getpass
 import os
+import re
+import shutil
 import subprocess
 import sys
 import time
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-
-from kitty.fast_data_types import add_timer, get_boss
+from typing import TextIO
 
 
 class KittenError(Exception):
     """Base exception for kitten errors that should be displayed to the user."""
 
 
+_TTY: TextIO | None = None
+
+
+def _tty() -> TextIO:
+    """
+    Return the terminal input stream, opening /dev/tty once per session.
+
+    Returns:
+        File object for /dev/tty, or sys.stdin if /dev/tty is not available
+    """
+    global _TTY
+    if _TTY is None:
+        try:
+            _TTY = open("/dev/tty", encoding="utf-8")  # noqa: SIM115
+            atexit.register(_TTY.close)
+        except OSError:
+            # Fallback to regular stdin if /dev/tty is not available
+            _TTY = sys.stdin
+    return _TTY
+
+
 def kitty_input(prompt: str = "") -> str:
     """
     Read input from the user in a kitty kitten context.
@@ -31,22 +56,36 @@ def kitty_input(prompt: str = "") -> str:
     Returns:
         The user's input as a string (stripped of whitespace)
     """
-    try:
-        with open("/dev/tty", encoding="utf-8") as tty:
-            if prompt:
-                sys.stdout.write(prompt)
-                sys.stdout.flush()
-            response = tty.readline().strip()
-            return response
-    except Exception:  # noqa: BLE001
-        # Fallback to regular input if /dev/tty is not available
-        return input(prompt).strip()
+    if prompt:
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+    return _tty().readline().strip()
+
+
+_SHELL_ENV: dict[str, str] | None = None
 
 
 def get_shell_env():
     """
     Get the environment variables from the user's shell to ensure PATH includes homebrew and other tools.
 
+    The environment does not change during the kitten's lifetime, so it is
+    computed once and reused on subsequent calls. Only fzf needs it; system
+    tools like `security` and `pbcopy` inherit the parent environment.
+
+    Returns:
+        Dictionary of environment variables with properly configured PATH
+    """
+    global _SHELL_ENV
+    if _SHELL_ENV is None:
+        _SHELL_ENV = _compute_shell_env()
+    return _SHELL_ENV
+
+
+def _compute_shell_env():
+    """
+    Build the environment for child processes with homebrew paths prepended to PATH.
+
     Returns:
         Dictionary of environment variables with properly configured PATH
     """
@@ -65,9 +104,8 @@ def get_shell_env():
     path_parts = current_path.split(":") if current_path else []
 
     # Add homebrew paths if they exist and aren't already in PATH
-    for brew_path in homebrew_paths:
-        if Path(brew_path).exists() and brew_path not in path_parts:
-            path_parts.insert(0, brew_path)
+    path_parts_set = set(path_parts)
+    path_parts[:0] = [p for p in homebrew_paths if p not in path_parts_set and os.path.isdir(p)]
 
     # Update PATH in environment
     env["PATH"] = ":".join(path_parts)
@@ -75,6 +113,11 @@ def get_shell_env():
     return env
 
 
+# Where homebrew installs fzf on this machine (Apple Silicon vs Intel)
+_HOMEBREW_FZF_PATH = "/opt/homebrew/bin/fzf" if os.uname().machine == "arm64" else "/usr/local/bin/fzf"
+
+
+@functools.lru_cache(maxsize=1)
 def find_fzf_path():
     """
     Try to find the fzf executable in common locations.
@@ -82,20 +125,14 @@ def find_fzf_path():
     Returns:
         Path to fzf executable, or just "fzf" if not found in known locations
     """
-    # Try to find fzf using 'which' with the proper environment
-    try:
-        env = get_shell_env()
-        result = subprocess.run(
-            ["which", "fzf"],
-            capture_output=True,
-            text=True,
-            check=False,
-            env=env,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-    except Exception:
-        pass
+    # Fast path: homebrew's default location for this architecture
+    if os.path.isfile(_HOMEBREW_FZF_PATH):
+        return _HOMEBREW_FZF_PATH
+
+    # Search the extended PATH in-process instead of spawning 'which'
+    fzf_path = shutil.which("fzf", path=get_shell_env().get("PATH"))
+    if fzf_path:
+        return fzf_path
 
     # Common fzf installation locations
     common_paths = [
@@ -113,6 +150,7 @@ def find_fzf_path():
     return "fzf"
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_service_name(service: str) -> tuple[str, str, str]:
     """
     Parse service name in format "friendly-name|username@hostname".
@@ -123,10 +161,10 @@ def parse_service_name(service: str) -> tuple[str, str, str]:
     Returns:
         Tuple of (friendly_name, username, hostname)
     """
-    if "|" in service:
-        friendly_name, connection = service.split("|", 1)
-        if "@" in connection:
-            username, hostname = connection.split("@", 1)
+    friendly_name, sep, connection = service.partition("|")
+    if sep:
+        username, sep, hostname = connection.partition("@")
+        if sep:
             return friendly_name, username, hostname
     # Fallback for malformed entries
     return service, "", ""
@@ -148,48 +186,152 @@ def format_display_name(service: str) -> str:
     return friendly_name
 
 
-def get_existing_keys() -> list[str]:
+# Matches the service attribute of a `security dump-keychain` record
+_KEYCHAIN_SVCE_RE = re.compile(rb'"svce"<blob>="([^"]+)"')
+
+
+def _parse_keychain_record(record: bytes) -> str | None:
     """
-    Retrieve all service keys from macOS Keychain where account='kitty-ssh'.
+    Extract the service key from a single `security dump-keychain` record.
+
+    Args:
+        record: Raw record bytes (without the leading "keychain: " marker)
 
     Returns:
-        List of service key names
+        Service key name if the record belongs to account 'kitty-ssh', otherwise None
     """
-    awk_script = """
-    BEGIN {RS="keychain: "}
-    /acct"<blob>="kitty-ssh"/ {
-        if (match($0, /"svce"<blob>="[^"]+/)) {
-            start = RSTART + 14;
-            len = RLENGTH - 14;
-            print substr($0, start, len)
-        }
-    }
+    if b'"acct"<blob>="kitty-ssh"' not in record:
+        return None
+    match = _KEYCHAIN_SVCE_RE.search(record)
+    if match:
+        key = match.group(1).decode("utf-8", errors="replace").strip()
+        if key:
+            return key
+    return None
+
+
+def iter_existing_keys() -> Iterator[str]:
     """
+    Stream service keys from macOS Keychain where account='kitty-ssh'.
 
-    try:
-        # Run security dump-keychain and pipe to awk
-        security_proc = subprocess.Popen(["security", "dump-keychain"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    The dump is read in chunks and records are parsed as soon as they are
+    complete, so the full keychain never has to be held in memory.
 
-        awk_proc = subprocess.Popen(
-            ["awk", awk_script], stdin=security_proc.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
+    Yields:
+        Service key names
 
+    Raises:
+        subprocess.CalledProcessError: If `security dump-keychain` exits with an error
+    """
+    security_proc = subprocess.Popen(["security", "dump-keychain"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        pending = b""
+        for chunk in iter(lambda: security_proc.stdout.read(65536), b""):
+            pending += chunk
+            *records, pending = pending.split(b"keychain: ")
+            for record in records:
+                key = _parse_keychain_record(record)
+                if key:
+                    yield key
+
+        # A locked keychain or killed dump ends early; don't pass a partial list off as complete
+        returncode = security_proc.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, security_proc.args)
+
+        # Last record has no trailing marker
+        key = _parse_keychain_record(pending)
+        if key:
+            yield key
+    finally:
         security_proc.stdout.close()
-        output, _ = awk_proc.communicate()
+        if security_proc.poll() is None:
+            security_proc.kill()
+        security_proc.wait()
+
+
+# Sidecar index of kitty-ssh service names, so listing doesn't require a full keychain dump
+_KEY_INDEX_PATH = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local/state") / "kitty-maocs/ssh-keys.txt"
+
+
+def _read_key_index() -> list[str] | None:
+    """
+    Read service keys from the sidecar index file.
 
-        if output:
-            return [key.strip() for key in output.strip().split("\n") if key.strip()]
-        return []
+    Returns:
+        List of service key names, or None if the index does not exist or cannot be read
+    """
+    try:
+        text = _KEY_INDEX_PATH.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    return [line for line in text.splitlines() if line]
+
+
+def _write_key_index(keys: Iterable[str]) -> None:
+    """
+    Replace the sidecar index file with the given service keys.
+
+    Failures are ignored; the index is rebuilt from the keychain on the next read.
+
+    Args:
+        keys: Service key names to store
+    """
+    # Per-process name so concurrent kittens don't clobber each other's tmp file
+    tmp_path = _KEY_INDEX_PATH.with_name(f"{_KEY_INDEX_PATH.name}.{os.getpid()}.tmp")
+    try:
+        _KEY_INDEX_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # The index lists every SSH target, so keep it readable by the owner only
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+        os.replace(tmp_path, _KEY_INDEX_PATH)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _invalidate_key_index() -> None:
+    """Remove the sidecar index file so the next listing rebuilds it from the keychain."""
+    try:
+        _KEY_INDEX_PATH.unlink()
+    except OSError:
+        pass
+
+
+def get_existing_keys() -> list[str]:
+    """
+    Retrieve all service keys from macOS Keychain where account='kitty-ssh'.
+
+    Keys are read from the sidecar index when present; otherwise the keychain
+    is dumped once and the index is rebuilt. A failed dump is not written to
+    the index.
+
+    Returns:
+        List of service key names
+    """
+    keys = _read_key_index()
+    if keys is not None:
+        return keys
+
+    try:
+        keys = list(iter_existing_keys())
     except Exception as e:
         raise KittenError(f"Error retrieving keychain keys: {e}") from e
 
+    _write_key_index(keys)
+    return keys
+
 
-def select_key_with_fzf(existing_keys: list[str]) -> tuple[str, str]:
+def select_key_with_fzf(existing_keys: list[str], fzf_cmd: str | None = None) -> tuple[str, str]:
     """
     Use fzf to select an existing SSH connection or create a new one.
 
     Args:
         existing_keys: List of existing service keys
+        fzf_cmd: Path to the fzf executable (looked up with find_fzf_path if omitted)
 
     Returns:
         Tuple of (selected_key, action) where action is one of:
@@ -198,50 +340,63 @@ def select_key_with_fzf(existing_keys: list[str]) -> tuple[str, str]:
         - "paste_only": Only paste password without connecting
     """
     try:
-        # Format display names for fzf
-        display_items = [format_display_name(key) for key in existing_keys]
-        input_data = "\n".join(display_items)
+        # Map display names for fzf back to their service keys (first match wins)
+        display_to_key: dict[str, str] = {}
+        for key in existing_keys:
+            display_to_key.setdefault(format_display_name(key), key)
         env = get_shell_env()
-        fzf_cmd = find_fzf_path()
+        if fzf_cmd is None:
+            fzf_cmd = find_fzf_path()
 
+        # fzf is launched per selection rather than kept alive with --listen: each kitten
+        # invocation runs in a fresh overlay window, and the create/delete prompts need the
+        # terminal back, so a long-lived fzf would have no tty to draw on.
         result = subprocess.run(
             [
                 fzf_cmd,
                 "--print-query",
+                # Entries are fed pre-sorted by name, so skip fzf's per-keystroke ranking
+                "--no-sort",
+                "--read0",
                 "--prompt=Select SSH connection or enter new name: ",
-                "--bind=ctrl-d:become(echo DELETE:{})+accept",
-                "--bind=ctrl-e:become(echo PASTE:{})+accept",
+                "--bind=ctrl-d:print(ACTION:DELETE)+accept",
+                "--bind=ctrl-e:print(ACTION:PASTE)+accept",
                 "--header=↵ Connect | ctrl+D Delete | ctrl+E Paste password | Ctrl+C Cancel",
             ],
-            input=input_data,
+            # fzf reads entries NUL-terminated (--read0)
+            input="".join(f"{display}\0" for display in sorted(display_to_key)),
             text=True,
+            encoding="utf-8",
+            errors="replace",
             capture_output=True,
             check=False,  # fzf returns non-zero exit codes for valid states (1=no match, 130=cancelled)
-            env=env,
+            # Inherit the parent environment unless homebrew paths had to be added
+            env=env if env["PATH"] != os.environ.get("PATH", "") else None,
         )
 
-        # Check the output for action prefixes
-        output = result.stdout.strip()
+        output = result.stdout
 
-        # Check if user wants to delete (output starts with DELETE:)
-        if output.startswith("DELETE:"):
-            display_name = output[7:]  # Remove "DELETE:" prefix
-            # Find the actual service key from display name
-            for i, display in enumerate(display_items):
-                if display == display_name:
-                    return (existing_keys[i], "delete")
-            # If not found in display items, try to use as-is
-            return (display_name, "delete")
-
-        # Check if user wants to paste only (output starts with PASTE:)
-        if output.startswith("PASTE:"):
-            display_name = output[6:]  # Remove "PASTE:" prefix
-            # Find the actual service key from display name
-            for i, display in enumerate(display_items):
-                if display == display_name:
-                    return (existing_keys[i], "paste_only")
-            # If not found in display items, try to use as-is
-            return (display_name, "paste_only")
+        # With --print-query a print() action outputs the query line, the marker, then the selection
+        # (no selection line, exit code 1, if nothing matched). A plain Enter yields at most two lines
+        # with exit code 0, so an entry whose display name equals a marker isn't mistaken for one.
+        lines = output.removesuffix("\n").split("\n")
+        marker = ""
+        selected_display = ""
+        if len(lines) == 3 or (len(lines) == 2 and result.returncode == 1):
+            marker = lines[1]
+            selected_display = lines[2] if len(lines) == 3 else ""
+
+        # Check if user wants to delete (ctrl-d printed ACTION:DELETE)
+        if marker == "ACTION:DELETE":
+            # Find the actual service key from display name, or use as-is if not found
+            return (display_to_key.get(selected_display, selected_display), "delete")
+
+        # Check if user wants to paste only (ctrl-e printed ACTION:PASTE)
+        if marker == "ACTION:PASTE":
+            # Find the actual service key from display name, or use as-is if not found
+            return (display_to_key.get(selected_display, selected_display), "paste_only")
+
+        output = output.strip()
 
         # fzf returns:
         # - exit code 0: user selected an item
@@ -265,10 +420,10 @@ def select_key_with_fzf(existing_keys: list[str]) -> tuple[str, str]:
                 selected_display = output_lines[-2]
 
             # Find the actual service key from display name
-            for i, display in enumerate(display_items):
-                if display == selected_display:
-                    print(f"DEBUG: Matched! Returning existing key: '{existing_keys[i]}'", file=sys.stderr)
-                    return (existing_keys[i], "connect")
+            selected_key = display_to_key.get(selected_display)
+            if selected_key is not None:
+                print(f"DEBUG: Matched! Returning existing key: '{selected_key}'", file=sys.stderr)
+                return (selected_key, "connect")
 
             return ("", "")
         elif result.returncode == 1:
@@ -298,6 +453,10 @@ def select_key_with_fzf(existing_keys: list[str]) -> tuple[str, str]:
         raise KittenError(f"Error during fzf selection: {e}") from e
 
 
+# Passwords already read from (or written to) the keychain during this session, keyed by service
+_PASSWORD_CACHE: dict[str, str] = {}
+
+
 def add_ssh_to_keychain(friendly_name: str, username: str, hostname: str, password: str) -> None:
     """
     Add a new SSH connection to macOS Keychain.
@@ -318,8 +477,14 @@ def add_ssh_to_keychain(friendly_name: str, username: str, hostname: str, passwo
             check=True,
             capture_output=True,
         )
+        _PASSWORD_CACHE[service] = password
+        index = _read_key_index()
+        if index is not None and service not in index:
+            _write_key_index([*index, service])
         print(f"✓ SSH connection '{friendly_name}' ({username}@{hostname}) added successfully")
     except subprocess.CalledProcessError as e:
+        # The index may be stale (e.g. the item was added in Keychain Access)
+        _invalidate_key_index()
         error_msg = f"Error adding SSH connection to keychain: {e.stderr.decode()}"
         raise KittenError(error_msg) from e
 
@@ -328,6 +493,9 @@ def get_password_from_keychain(service: str) -> str:
     """
     Retrieve a password from macOS Keychain.
 
+    Passwords are cached in-process so repeated lookups for the same service
+    during one session don't spawn another `security` call.
+
     Args:
         service: Service name (key)
 
@@ -337,6 +505,13 @@ def get_password_from_keychain(service: str) -> str:
     Raises:
         KittenError: If the password cannot be retrieved
     """
+    cached = _PASSWORD_CACHE.get(service)
+    if cached is not None:
+        return cached
+
+    # This is the only subprocess after selection: the password goes back to kitty, which pastes it and
+    # the SSH command itself. Items added by `security` trust only that binary, so reading them through
+    # the Security framework in-process would raise a keychain access prompt for kitty instead.
     try:
         result = subprocess.run(
             ["security", "find-generic-password", "-a", "kitty-ssh", "-s", service, "-w"],
@@ -344,8 +519,12 @@ def get_password_from_keychain(service: str) -> str:
             capture_output=True,
             text=True,
         )
-        return result.stdout.strip()
+        password = result.stdout.strip()
+        _PASSWORD_CACHE[service] = password
+        return password
     except subprocess.CalledProcessError as e:
+        # The index may be stale (e.g. the item was removed in Keychain Access)
+        _invalidate_key_index()
         error_msg = f"Could not retrieve password for '{service}'"
         if e.stderr:
             error_msg += f": {e.stderr.decode()}"
@@ -368,22 +547,41 @@ def delete_ssh_from_keychain(service: str) -> None:
             check=True,
             capture_output=True,
         )
+        _PASSWORD_CACHE.pop(service, None)
+        index = _read_key_index()
+        if index is not None:
+            _write_key_index(key for key in index if key != service)
         friendly_name, username, hostname = parse_service_name(service)
         print(f"✓ SSH connection '{friendly_name}' ({username}@{hostname}) deleted successfully")
     except subprocess.CalledProcessError as e:
+        # The index may be stale (e.g. the item was removed in Keychain Access)
+        _invalidate_key_index()
         error_msg = f"Error deleting SSH connection from keychain: {e.stderr.decode()}"
         raise KittenError(error_msg) from e
 
 
 def copy_to_clipboard(text: str) -> None:
     """
-    Copy text to macOS clipboard using pbcopy.
+    Copy text to macOS clipboard.
+
+    Writes to NSPasteboard in-process when PyObjC is available, otherwise
+    falls back to pbcopy.
 
     Args:
         text: Text to copy to clipboard
     """
     try:
-        subprocess.run(["pbcopy"], input=text.encode(), check=True)
+        from AppKit import NSPasteboard, NSStringPboardType
+    except ImportError:
+        pass
+    else:
+        pasteboard = NSPasteboard.generalPasteboard()
+        pasteboard.clearContents()
+        if pasteboard.setString_forType_(text, NSStringPboardType):
+            return
+
+    try:
+        subprocess.run(["pbcopy"], input=text, text=True, encoding="utf-8", check=True)
     except subprocess.CalledProcessError as e:
         raise KittenError(f"Failed to copy to clipboard: {e}") from e
 
@@ -424,9 +622,11 @@ def main(args):  # noqa: ARG001
         try:
             # Get existing keys from keychain
             existing_keys = get_existing_keys()
+            existing_key_set = set(existing_keys)
+            fzf_cmd = find_fzf_path()
 
             # Let user select or enter a key using fzf
-            selected_key, action = select_key_with_fzf(existing_keys)
+            selected_key, action = select_key_with_fzf(existing_keys, fzf_cmd)
 
             if not selected_key:
                 # User cancelled
@@ -434,7 +634,7 @@ def main(args):  # noqa: ARG001
 
             # Handle delete action
             if action == "delete":
-                if selected_key in existing_keys:
+                if selected_key in existing_key_set:
                     if confirm_delete(selected_key):
                         delete_ssh_from_keychain(selected_key)
                         time.sleep(1)  # Brief delay to show success message
@@ -447,7 +647,7 @@ def main(args):  # noqa: ARG001
 
             # Handle paste only action
             if action == "paste_only":
-                if selected_key in existing_keys:
+                if selected_key in existing_key_set:
                     # Existing connection - retrieve password and return for paste only
                     friendly_name, username, hostname = parse_service_name(selected_key)
 
@@ -466,7 +666,7 @@ def main(args):  # noqa: ARG001
                     raise KittenError(f"Cannot paste password: '{selected_key}' does not exist")
 
             # Check if this is a new connection or existing one
-            if selected_key in existing_keys:
+            if selected_key in existing_key_set:
                 # Existing connection - retrieve password and return SSH command with password
                 friendly_name, username, hostname = parse_service_name(selected_key)
 
@@ -528,95 +728,97 @@ def main(args):  # noqa: ARG001
             return {}
 
 
-from kittens.tui.handler import result_handler
-
-
-@result_handler(type_of_input="text")
-def handle_result(args, answer, target_window_id, boss):  # noqa: ARG001
-    """
-    Handle the result from main() - send SSH command to the active window and auto-fill password.
-
-    Args:
-        args: Command line arguments
-        answer: Return value from main() (dict with ssh_command and password, or password_only)
-        target_window_id: ID of the window that launched the kitten
-        boss: Boss instance for controlling kitty
-    """
-    # Get the target window
-    w = boss.window_id_map.get(target_window_id)
-
-    if w is None:
-        return
-
-    # If answer is empty dict, nothing to do
-    if not answer:
-        return
-
-    # Check if this is a password-only paste request
-    password_only = answer.get("password_only", "")
-    if password_only:
-        # Just paste the password without pressing Enter
-        w.paste_text(password_only)
-        return
-
-    # Extract ssh_command and password from the answer dict
-    ssh_command = answer.get("ssh_command", "")
-    password = answer.get("password", "")
-
-    if not ssh_command:
-        return
-
-    w.paste_text(ssh_command)
-    w.send_key("Enter")
-
-    # If we have a password, set up a timer to detect password prompt
-    if password:
-        attempt_count = 0  # Use list to allow modification in nested function
-        max_attempts = 50
-        interval = 0.05
-
-        def check_for_password_prompt(timer_id: int | None) -> None:
-            """Check screen content for password prompt and paste password if found."""
-            nonlocal attempt_count
-            attempt_count += 1
-
-            # Get current active window dynamically
-            current_boss = get_boss()
-            current_window = current_boss.active_window
-
-            # Fallback to original window if active window is None
-            if current_window is None or current_window.destroyed:
-                current_window = current_boss.window_id_map.get(target_window_id)
-
-            # Check if window is valid
-            if current_window is None or current_window.destroyed:
-                return
-
-            try:
-                # Read screen content
-                screen_text = current_window.as_text(as_ansi=False, add_history=False)
-
-                # Check if "password:" appears in the screen (case-sensitive lowercase)
-                if "password:" in screen_text.lower():
-                    # Found password prompt! Paste password and send Enter
-                    current_window.paste_text(password)
-                    current_window.send_key("Enter")
-                    return  # Stop checking
-
-                # Check if we've reached max attempts
-                if attempt_count >= max_attempts:
-                    return  # Stop checking after max attempts
-
-                # Schedule next check
-                add_timer(check_for_password_prompt, interval, False)
-
-            except Exception:
-                # Silently handle any errors reading screen content
-                pass
-
-        # Start the timer
-        add_timer(check_for_password_prompt, interval, False)
-
-    # Paste the SSH command and execute it
-    w.paste(ssh_command)
-    w.send_key("Enter")
+# handle_result only runs inside kitty; skip importing its TUI layer when run directly
+if __name__ != "__main__":
+    from kitty.fast_data_types import add_timer, get_boss
+    from kittens.tui.handler import result_handler
+
+    @result_handler(type_of_input="text")
+    def handle_result(args, answer, target_window_id, boss):  # noqa: ARG001
+        """
+        Handle the result from main() - send SSH command to the active window and auto-fill password.
+
+        Args:
+            args: Command line arguments
+            answer: Return value from main() (dict with ssh_command and password, or password_only)
+            target_window_id: ID of the window that launched the kitten
+            boss: Boss instance for controlling kitty
+        """
+        # Get the target window
+        w = boss.window_id_map.get(target_window_id)
+
+        if w is None:
+            return
+
+        # If answer is empty dict, nothing to do
+        if not answer:
+            return
+
+        # Check if this is a password-only paste request
+        password_only = answer.get("password_only", "")
+        if password_only:
+            # Just paste the password without pressing Enter
+            w.paste_text(password_only)
+            return
+
+        # Extract ssh_command and password from the answer dict
+        ssh_command = answer.get("ssh_command", "")
+        password = answer.get("password", "")
+
+        if not ssh_command:
+            return
+
+        w.paste_text(ssh_command)
+        w.send_key("Enter")
+
+        # If we have a password, set up a timer to detect password prompt
+        if password:
+            attempt_count = 0  # Use list to allow modification in nested function
+            max_attempts = 50
+            interval = 0.05
+
+            def check_for_password_prompt(timer_id: int | None) -> None:
+                """Check screen content for password prompt and paste password if found."""
+                nonlocal attempt_count
+                attempt_count += 1
+
+                # Get current active window dynamically
+                current_boss = get_boss()
+                current_window = current_boss.active_window
+
+                # Fallback to original window if active window is None
+                if current_window is None or current_window.destroyed:
+                    current_window = current_boss.window_id_map.get(target_window_id)
+
+                # Check if window is valid
+                if current_window is None or current_window.destroyed:
+                    return
+
+                try:
+                    # Read screen content
+                    screen_text = current_window.as_text(as_ansi=False, add_history=False)
+
+                    # Check if "password:" appears in the screen (case-sensitive lowercase)
+                    if "password:" in screen_text.lower():
+                        # Found password prompt! Paste password and send Enter
+                        current_window.paste_text(password)
+                        current_window.send_key("Enter")
+                        return  # Stop checking
+
+                    # Check if we've reached max attempts
+                    if attempt_count >= max_attempts:
+                        return  # Stop checking after max attempts
+
+                    # Schedule next check
+                    add_timer(check_for_password_prompt, interval, False)
+
+                except Exception:
+                    # Silently handle any errors reading screen content
+                    pass
+
+            # Start the timer
+            add_timer(check_for_password_prompt, interval, False)
+
+        # Paste the SSH command and execute it
+        w.paste(ssh_command)
+        w.send_key("Enter")